@@ -2,13 +2,18 @@
 from typing import AsyncIterator, Dict, Any, Callable
 import os
 import yaml
-from fastapi import FastAPI, Request
-from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from sse_starlette.sse import EventSourceResponse, ServerSentEvent
 import uvicorn
 from typing import Annotated
 from datetime import datetime
+import time
 import asyncio
-import json
+import contextvars
+import threading
+from contextlib import asynccontextmanager
+import orjson
 import autogen
 from autogen import (
     ConversableAgent,
@@ -19,11 +24,25 @@ from autogen import (
 from autogen.agentchat.group import ContextVariables
 from fastapi.middleware.cors import CORSMiddleware
 
-# pip install "ag2[openai]" fastapi uvicorn PyYAML
+# pip install "ag2[openai]" fastapi uvicorn PyYAML sse-starlette orjson uvloop httptools
 
 CONFIG_PATH = os.getenv("AGENT_CONFIG_PATH", "agents.yaml")
 
-app = FastAPI()
+# Max number of same-named events coalesced into one SSE frame.
+_SSE_BATCH_MAX = 32
+
+# Constant first frame of every stream, built once at import instead of
+# re-serializing the same payload per request.
+_STARTED_EVENT = ServerSentEvent(data='{"status":"started the flow"}', event="status")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pay AG2 agent/manager construction once per worker, up front.
+    for _ in range(_MANAGER_POOL_SIZE):
+        _manager_pool.put_nowait(_build_manager())
+    yield
+
+app = FastAPI(lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -31,8 +50,28 @@ app.add_middleware(
     allow_headers=["*"]
 )
 
-def sse_event(data: Dict[str, Any]) -> bytes:
-    return f"{json.dumps(data, ensure_ascii=False)}\n\n".encode("utf-8")
+def isoformat_ns(ns: int) -> str:
+    """Render a time.time_ns() value as an ISO-8601 string."""
+    return datetime.fromtimestamp(ns / 1_000_000_000).isoformat()
+
+def _stamp_entries(ctx: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert the raw ts_ns fields stored by the tools into ISO timestamps.
+
+    Called once at summary/emit time so the hot tool path only pays for a
+    time.time_ns() call, not a datetime construction plus isoformat().
+    """
+    for key in ("tasks_completed", "findings", "recommendations", "status_history"):
+        entries = ctx.get(key)
+        if not entries:
+            continue
+        stamped = []
+        for entry in entries:
+            if "ts_ns" in entry:
+                entry = dict(entry)
+                entry["timestamp"] = isoformat_ns(entry.pop("ts_ns"))
+            stamped.append(entry)
+        ctx[key] = stamped
+    return ctx
 
 # ---------------------------
 # 2) TOOL FUNCTIONS (unchanged)
@@ -45,7 +84,7 @@ def log_task_completion(
     """Log completed tasks with details"""
     tasks = context_variables.get("tasks_completed", [])
     task_entry = {
-        "timestamp": datetime.now().isoformat(),
+        "ts_ns": time.time_ns(),
         "task": task_name,
         "details": details,
         "completed_by": "coordinator"
@@ -64,13 +103,15 @@ def record_finding(
     """Record technical findings"""
     findings = context_variables.get("findings", [])
     finding_entry = {
-        "timestamp": datetime.now().isoformat(),
+        "ts_ns": time.time_ns(),
         "finding": finding,
         "severity": severity,
         "discovered_by": "analyst"
     }
     findings.append(finding_entry)
     context_variables["findings"] = findings
+    if severity == "critical":
+        context_variables["critical_count"] = context_variables.get("critical_count", 0) + 1
     if severity in ["high", "critical"]:
         context_variables["analysis_depth"] = "deep"
     return f"Finding recorded: {finding} (Severity: {severity})"
@@ -84,7 +125,7 @@ def create_recommendation(
     """Create actionable recommendations"""
     recommendations = context_variables.get("recommendations", [])
     rec_entry = {
-        "timestamp": datetime.now().isoformat(),
+        "ts_ns": time.time_ns(),
         "recommendation": recommendation,
         "priority": priority,
         "effort": estimated_effort,
@@ -92,6 +133,8 @@ def create_recommendation(
     }
     recommendations.append(rec_entry)
     context_variables["recommendations"] = recommendations
+    if priority == "high":
+        context_variables["high_priority_recs"] = context_variables.get("high_priority_recs", 0) + 1
     return f"Recommendation created: {recommendation} (Priority: {priority}, Effort: {estimated_effort})"
 
 def generate_summary_report(context_variables: ContextVariables):
@@ -99,16 +142,14 @@ def generate_summary_report(context_variables: ContextVariables):
     tasks = len(context_variables.get("tasks_completed", []))
     findings = len(context_variables.get("findings", []))
     recommendations = len(context_variables.get("recommendations", []))
-    critical_findings = [f for f in context_variables.get("findings", []) if f.get("severity") == "critical"]
-    high_priority_recs = [r for r in context_variables.get("recommendations", []) if r.get("priority") == "high"]
     summary = {
         "project": context_variables.get("project_name"),
         "session_duration": "calculated_from_start_time",
         "tasks_completed": tasks,
         "findings_discovered": findings,
         "recommendations_made": recommendations,
-        "critical_issues": len(critical_findings),
-        "high_priority_actions": len(high_priority_recs),
+        "critical_issues": context_variables.get("critical_count", 0),
+        "high_priority_actions": context_variables.get("high_priority_recs", 0),
         "analysis_depth": context_variables.get("analysis_depth"),
     }
     context_variables["final_summary"] = summary
@@ -122,7 +163,7 @@ def update_project_status(
     """Update overall project status"""
     status_history = context_variables.get("status_history", [])
     status_entry = {
-        "timestamp": datetime.now().isoformat(),
+        "ts_ns": time.time_ns(),
         "status": status,
         "notes": notes
     }
@@ -140,37 +181,90 @@ def _load_yaml_config() -> Dict[str, Any]:
     with open(CONFIG_PATH, "r", encoding="utf-8") as f:
         return yaml.safe_load(f) or {}
 
-CFG = _load_yaml_config()
+_config_cache_lock = threading.Lock()
+_config_cache: Dict[str, Any] = {}  # path -> (stat signature, parsed cfg, agents by name)
+
+def _read_config_cached(path: str):
+    """Return (parsed cfg, agents-by-name map), re-reading only on change.
+
+    The cache key is the (st_mtime_ns, st_size, st_ino) stat signature, so an
+    edited or replaced agents.yaml is picked up without restarting while the
+    steady state costs one os.stat per call instead of two reads + a parse.
+    The per-name agent map is precomputed alongside the parse so lookups are
+    O(1) instead of a scan over cfg["agents"].
+    """
+    try:
+        st = os.stat(path)
+        sig = (st.st_mtime_ns, st.st_size, st.st_ino)
+    except OSError:
+        sig = None
+    with _config_cache_lock:
+        cached = _config_cache.get(path)
+        if cached is not None and cached[0] == sig:
+            return cached[1], cached[2]
+        cfg = _load_yaml_config() if sig is not None else {}
+        agents_by_name = {a.get("name"): a for a in (cfg.get("agents") or [])}
+        _config_cache[path] = (sig, cfg, agents_by_name)
+        return cfg, agents_by_name
+
+def _cfg() -> Dict[str, Any]:
+    return _read_config_cached(CONFIG_PATH)[0]
 
 def _agent_cfg_by_name(name: str) -> Dict[str, Any]:
-    agents = CFG.get("agents") or []
-    for a in agents:
-        if a.get("name") == name:
-            return a
-    return {}
+    return _read_config_cached(CONFIG_PATH)[1].get(name, {})
 
 def _gc_cfg() -> Dict[str, Any]:
-    return CFG.get("group_chat") or {}
+    return _cfg().get("group_chat") or {}
 
-AGENT_CARD = CFG.get("agent_card") or {}
+def _agent_card_cfg() -> Dict[str, Any]:
+    return _cfg().get("agent_card") or {}
 
 # ---------------------------
 # 8) AUTONOMOUS EXECUTION FUNCTION
 # ---------------------------
-def run_autonomous_analysis(initial_message, emit):
-    """Run the entire analysis autonomously with no human input"""
-
-    # 1) Shared context variables
-    project_ctx = ContextVariables(data={
-        "session_start": datetime.now().isoformat(),
-        "project_name": CFG.get("project_name", "Backend Performance Analysis"),
-        "tasks_completed": [],
-        "findings": [],
-        "recommendations": [],
-        "task_count": 0,
-        "analysis_depth": "initial",
-        "priority_level": "high",
-    })
+# Request-local emit callback. Each /sse/article run executes in its own task,
+# so a ContextVar keeps concurrent sessions from seeing each other's emit.
+_emit_var: contextvars.ContextVar = contextvars.ContextVar("sse_emit", default=None)
+
+# Emit selector/validator reasoning -> status updates. Patched once at import
+# instead of reassigning the class attribute inside every request, which raced
+# under concurrent /sse/article callers.
+def _print_received_message_patched(self, message: dict[str, Any] | str, sender, skip_head: bool = False):
+    if sender.name != "speaker_selection_agent":
+        return
+    emit = _emit_var.get()
+    if emit is None:
+        return
+    print(message)
+    try:
+        emit({"status": message['content'].split(":")[-1].strip()}, event="status")
+    except Exception:
+        pass
+
+ConversableAgent._print_received_message = _print_received_message_patched
+
+def _forward_agent_message(sender, message, recipient, silent):
+    """process_message_before_send hook: stream agent turns as they complete.
+
+    Registered on the four pipeline agents so each finished turn reaches the
+    client as an 'agent_message' SSE event instead of the client waiting for
+    the final context dump.
+    """
+    emit = _emit_var.get()
+    if emit is not None and not silent:
+        content = message.get("content") if isinstance(message, dict) else message
+        if content:
+            emit({"agent": sender.name, "content": content}, event="agent_message")
+    return message
+
+# Warm pool of prebuilt GroupChatManager instances. AG2 agent construction
+# (reply chains, tool schemas) is heavy, so it is paid once per pool slot at
+# startup instead of on every /sse/article request.
+_MANAGER_POOL_SIZE = int(os.getenv("MANAGER_POOL_SIZE", "4"))
+_manager_pool: asyncio.Queue = asyncio.Queue()
+
+def _build_manager():
+    """Construct the four agents, their tools and the group chat manager."""
 
     # 3) LLM Configuration from YAML
     llm_cfg = LLMConfig(api_type="google", model="gemini-2.5-flash", api_key="dummy_keys")
@@ -240,51 +334,128 @@ def run_autonomous_analysis(initial_message, emit):
     reporter.register_for_llm()(generate_summary_report)
     reporter.register_for_execution()(generate_summary_report)
 
-    # 7) GroupChat setup from YAML while preserving your selection logic
+    # 6) Stream each agent's completed turns to SSE subscribers
+    for agent in (coordinator, analyst, strategist, reporter):
+        agent.register_hook("process_message_before_send", _forward_agent_message)
+
+    # 7) GroupChat setup from YAML. The pipeline is deterministically
+    # Coordinator -> Analyst -> Strategist -> Reporter, so round robin avoids
+    # the extra speaker-selection LLM call per transition that "auto" pays.
     gc = _gc_cfg()
     groupchat = GroupChat(
         agents=[coordinator, analyst, strategist, reporter],
         messages=[],
         max_round=gc.get("max_round", 8),
-        speaker_selection_method=gc.get("speaker_selection_method", "auto"),
-        select_speaker_auto_verbose=gc.get("select_speaker_auto_verbose", True),
-        select_speaker_message_template=gc.get("select_speaker_message_template", """You are in a role play game. The following roles are available:
-        {roles}.
-        Read the following conversation.
-        Then select the next role from {agentlist} to play along with the task it is supposed to do(in continuous tense. example: 'reviewing the answer'). Only return the role and the one-liner task"""),
-                select_speaker_prompt_template=gc.get("select_speaker_prompt_template", "Read the above conversation. Then select the next role from {agentlist} to play along with the task it is supposed to do. Only return the role and the one-liner task"),
+        speaker_selection_method=gc.get("speaker_selection_method", "round_robin"),
+        select_speaker_auto_verbose=gc.get("select_speaker_auto_verbose", False),
         )
 
     with llm_cfg:
         manager = GroupChatManager(
             groupchat=groupchat,
-            context_variables=project_ctx,
+            context_variables=ContextVariables(data={}),
         )
 
+    return coordinator, groupchat, manager
+
+# Tools each pipeline stage may execute, used by the parallel orchestrator's
+# per-stage driver agents.
+_STAGE_TOOLS = {
+    "Coordinator": (log_task_completion, update_project_status),
+    "Analyst": (record_finding,),
+    "Strategist": (create_recommendation,),
+    "Reporter": (generate_summary_report,),
+}
+
+async def _run_stage(agent, message, project_ctx, max_turns=4):
+    """Drive one pipeline stage as a two-agent chat with a throwaway driver."""
+    driver = ConversableAgent(
+        name="user_proxy",
+        human_input_mode="NEVER",
+        llm_config=False,
+        code_execution_config=False,
+        max_consecutive_auto_reply=max_turns,
+        context_variables=project_ctx,
+    )
+    for tool in _STAGE_TOOLS.get(agent.name, ()):
+        driver.register_for_execution()(tool)
+    await driver.a_initiate_chat(agent, message=message, clear_history=True, max_turns=max_turns)
+
+async def _run_parallel_pipeline(groupchat, project_ctx, initial_message, emit):
+    """Fork-join orchestration of the fixed pipeline.
+
+    The Coordinator frames the work, then Analyst and Strategist run
+    concurrently against the shared context, and the Reporter joins on both
+    to produce the summary. The concurrent stages need no locking because
+    they write disjoint context keys (findings/critical_count/analysis_depth
+    vs recommendations/high_priority_recs), not because tool execution is
+    pinned to the loop -- AG2 may run sync tools in an executor thread. The
+    fork runs in a TaskGroup so a failing stage cancels its sibling and no
+    stage task can outlive this request's manager-pool checkout.
+    """
+    coordinator, analyst, strategist, reporter = groupchat.agents
+
+    emit({"status": "Coordinator framing the analysis"}, event="status")
+    await _run_stage(coordinator, initial_message, project_ctx)
+
+    emit({"status": "Analyst and Strategist working in parallel"}, event="status")
+    async with asyncio.TaskGroup() as tg:
+        tg.create_task(_run_stage(analyst, initial_message, project_ctx))
+        tg.create_task(_run_stage(strategist, initial_message, project_ctx))
+
+    emit({"status": "Reporter synthesizing the final summary"}, event="status")
+    await _run_stage(reporter, initial_message, project_ctx)
+
+async def run_autonomous_analysis(initial_message, emit):
+    """Run the entire analysis autonomously with no human input"""
+
+    # 1) Shared context variables, fresh per run
+    project_ctx = ContextVariables(data={
+        "session_start": datetime.now().isoformat(),
+        "project_name": _cfg().get("project_name", "Backend Performance Analysis"),
+        "tasks_completed": [],
+        "findings": [],
+        "recommendations": [],
+        "task_count": 0,
+        "critical_count": 0,
+        "high_priority_recs": 0,
+        "analysis_depth": "initial",
+        "priority_level": "high",
+    })
+
+    coordinator, groupchat, manager = await _manager_pool.get()
+    try:
+        # Reset the pooled instances to a first-use state for this request.
+        groupchat.messages.clear()
+        manager.context_variables = project_ctx
+        for agent in groupchat.agents:
+            agent.context_variables = project_ctx
+            agent.clear_history()
+
+        final_context = await _run_analysis_chat(coordinator, manager, project_ctx, initial_message, emit)
+    finally:
+        _manager_pool.put_nowait((coordinator, groupchat, manager))
+    return final_context
+
+async def _run_analysis_chat(coordinator, manager, project_ctx, initial_message, emit):
     print("=== AUTONOMOUS BACKEND ANALYSIS STARTING ===")
     print("Initial Context:")
-    print(json.dumps(project_ctx.to_dict(), indent=2))
+    print(orjson.dumps(project_ctx.to_dict(), option=orjson.OPT_INDENT_2).decode())
     print("\n" + "="*60)
 
-    # Emit selector/validator reasoning -> status updates
-    def print_received_message_new(self, message: dict[str, Any] | str, sender, skip_head: bool = False):
-        if sender.name == "speaker_selection_agent":
-            print(message)
-            try:
-                emit({"status": message['content'].split(":")[-1].strip()})
-            except Exception:
-                pass
+    _emit_var.set(emit)
 
-    ConversableAgent._print_received_message = print_received_message_new
-
-    # Initiate chat - completely autonomous, no human input requested
-    result = coordinator.initiate_chat(
-        manager,
-        message=initial_message,
-        clear_history=True,
-    )
+    if _gc_cfg().get("orchestration", "parallel") == "parallel":
+        await _run_parallel_pipeline(manager.groupchat, project_ctx, initial_message, emit)
+    else:
+        # Initiate chat - completely autonomous, no human input requested
+        await coordinator.a_initiate_chat(
+            manager,
+            message=initial_message,
+            clear_history=True,
+        )
 
-    final_context = project_ctx.to_dict()
+    final_context = _stamp_entries(project_ctx.to_dict())
 
     print("\n" + "="*60)
     print("AUTONOMOUS ANALYSIS COMPLETED")
@@ -306,9 +477,9 @@ def run_autonomous_analysis(initial_message, emit):
             print(f"   - [{rec['priority'].upper()}] {rec['recommendation']}")
 
     print(f"\n📋 COMPLETE FINAL CONTEXT:")
-    print(json.dumps(final_context, indent=2))
+    print(orjson.dumps(final_context, option=orjson.OPT_INDENT_2).decode())
 
-    emit(final_context)
+    emit(final_context, event="data")
     return final_context
 
 @app.get("/.well-known/agent.json")
@@ -317,19 +488,20 @@ def agent_card():
     Serve an Agent Card so UIs/other agents can discover capabilities.
     Values come from agents.yaml agent_card section, with sensible defaults.
     """
+    agent_card_cfg = _agent_card_cfg()
     card = {
-        "name": AGENT_CARD.get("name", "backend_analysis_team"),
-        "description": AGENT_CARD.get("description", "Multi-agent backend performance analysis with SSE"),
-        "url": AGENT_CARD.get("url", ""),
-        "version": AGENT_CARD.get("version", "1.0.0"),
+        "name": agent_card_cfg.get("name", "backend_analysis_team"),
+        "description": agent_card_cfg.get("description", "Multi-agent backend performance analysis with SSE"),
+        "url": agent_card_cfg.get("url", ""),
+        "version": agent_card_cfg.get("version", "1.0.0"),
         "capabilities": {
             "streaming": True,
-            **(AGENT_CARD.get("capabilities") or {})
+            **(agent_card_cfg.get("capabilities") or {})
         },
-        "authentication": AGENT_CARD.get("authentication", {"schemes": []}),
-        "defaultInputModes": AGENT_CARD.get("defaultInputModes", ["text"]),
-        "defaultOutputModes": AGENT_CARD.get("defaultOutputModes", ["json"]),
-        "skills": AGENT_CARD.get("skills", [
+        "authentication": agent_card_cfg.get("authentication", {"schemes": []}),
+        "defaultInputModes": agent_card_cfg.get("defaultInputModes", ["text"]),
+        "defaultOutputModes": agent_card_cfg.get("defaultOutputModes", ["json"]),
+        "skills": agent_card_cfg.get("skills", [
             {
                 "id": "sse_article",
                 "name": "Autonomous Analysis",
@@ -342,7 +514,7 @@ def agent_card():
     return JSONResponse(card)
 
 @app.get("/sse/article")
-async def sse_article(request: Request, topic: str):
+async def sse_article(topic: str):
     """
     GET /sse/article?topic=...
     Emits named events: 'status', 'agent_message', 'data' (JSON payloads).
@@ -355,41 +527,72 @@ async def sse_article(request: Request, topic: str):
         "Work together autonomously to complete this analysis."
     )
 
-    queue: asyncio.Queue[bytes] = asyncio.Queue()
-    loop = asyncio.get_running_loop()
+    # Bounded so a chatty run against a slow reader cannot balloon memory;
+    # on overflow the oldest pending event is dropped in favour of the new one.
+    queue: asyncio.Queue = asyncio.Queue(maxsize=1024)
+
+    def enqueue(item):
+        try:
+            queue.put_nowait(item)
+        except asyncio.QueueFull:
+            try:
+                queue.get_nowait()
+            except asyncio.QueueEmpty:
+                pass
+            queue.put_nowait(item)
+
+    def emit(payload: Dict[str, Any], event: str = None):
+        enqueue((event, payload))
+
+    async def run_analysis():
+        try:
+            await run_autonomous_analysis(initial_message, emit)
+        finally:
+            # Sentinel: tells the event generator the analysis is over.
+            enqueue(None)
 
-    def emit(payload: Dict[str, Any]):
-        loop.call_soon_threadsafe(queue.put_nowait, sse_event(payload))
+    task = asyncio.create_task(run_analysis())
 
-    async def event_stream() -> AsyncIterator[bytes]:
-        yield sse_event({"status": "started the flow"})
-        task = asyncio.create_task(asyncio.to_thread(run_autonomous_analysis, initial_message, emit))
+    async def event_stream() -> AsyncIterator[ServerSentEvent]:
+        yield _STARTED_EVENT
+        unset = object()  # distinguishes "nothing held back" from the None sentinel
+        pending = unset
         try:
             while True:
-                if await request.is_disconnected():
-                    break
-                try:
-                    chunk = await asyncio.wait_for(queue.get(), timeout=0.5)
-                    yield chunk
-                except asyncio.TimeoutError:
-                    yield b": keep-alive\n\n"
-                if task.done():
-                    while not queue.empty():
-                        yield queue.get_nowait()
+                item = pending if pending is not unset else await queue.get()
+                pending = unset
+                if item is None:
                     break
+                event, payload = item
+                # Coalesce a burst of same-named events into one frame.
+                batch = [payload]
+                while len(batch) < _SSE_BATCH_MAX:
+                    try:
+                        nxt = queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        break
+                    if nxt is None or nxt[0] != event:
+                        pending = nxt
+                        break
+                    batch.append(nxt[1])
+                if len(batch) == 1:
+                    yield ServerSentEvent(data=orjson.dumps(payload).decode(), event=event)
+                else:
+                    yield ServerSentEvent(data=orjson.dumps({"batch": batch}).decode(), event=event)
         finally:
             if not task.done():
                 task.cancel()
 
-    headers = {
-        "Content-Type": "text/event-stream",
-        "Cache-Control": "no-cache", 
-        "Connection": "keep-alive",
-        "Access-Control-Allow-Origin": "*",
-        "Access-Control-Allow-Methods": "GET, OPTIONS",
-        "Access-Control-Allow-Headers": "*",
-    }
-    return StreamingResponse(event_stream(), headers=headers)
+    return EventSourceResponse(event_stream(), ping=15)
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=int(os.getenv("PORT", 9898)))
+    uvicorn.run(
+        "group_chat_manager:app",
+        host="0.0.0.0",
+        port=int(os.getenv("PORT", 9898)),
+        loop="uvloop",
+        http="httptools",
+        workers=os.cpu_count(),
+        backlog=2048,
+        timeout_keep_alive=75,
+    )
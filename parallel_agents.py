@@ -1,8 +1,8 @@
-# pip install ag2[openai] nest_asyncio
+# pip install ag2[openai]
 import asyncio
+import logging
 from typing import Dict, Any
 
-import nest_asyncio
 from autogen import (
     ConversableAgent,
     LLMConfig,
@@ -10,10 +10,10 @@ UserProxyAgent
 )
 from autogen.agentchat.group.context_variables import ContextVariables
 from autogen.agentchat.group.patterns import AutoPattern
-from autogen.agentchat import a_initiate_group_chat, initiate_group_chat
+from autogen.agentchat import a_initiate_group_chat
 from autogen.agentchat.group import ReplyResult
 
-nest_asyncio.apply()
+logger = logging.getLogger(__name__)
 
 # ---------
 # LLM Configuration
@@ -71,7 +71,7 @@ async def check_terminate(message: str, terminate_keyword: str = "TERMINATE") ->
     Returns:
         bool: True if the termination keyword is found, False otherwise.
     """
-    print(message)
+    logger.debug("termination check: %r", message)
     if not message:
         return False
     return terminate_keyword.lower() in message['content'].strip().lower()
@@ -103,7 +103,7 @@ async def summarize_comments(fb: str, ig: str, reddit: str, context_variables: C
 
 async def clarify_summary(summary: str, query_to_user: str, context_variables: ContextVariables):
     user_comment = input(query_to_user)
-    print(user_comment)
+    logger.debug("user clarification: %s", user_comment)
     return ReplyResult(message=user_comment, context_variables=context_variables)
     
 
@@ -254,8 +254,6 @@ async def run_subagent(agent: ConversableAgent, company: str) -> str:
         }
     ]
 
-    from autogen.agentchat import initiate_group_chat
-    
     result, updated_context, last_agent = await a_initiate_group_chat(
         pattern=pattern, messages=messages, max_rounds=10
     )
@@ -274,8 +272,7 @@ async def extract_info_async(company: str) -> Dict[str, Any]:
         run_subagent(revenue_agent, company),
     ]
     results = await asyncio.gather(*tasks)
-    print("done executing all subagents")
-    print(results)
+    logger.debug("done executing all subagents: %r", results)
 
     # context_variables.set("social_summary", results[0])
     # context_variables.set("news_summary", results[1])
@@ -288,16 +285,13 @@ async def extract_info_async(company: str) -> Dict[str, Any]:
     }
 
 
-def extract_info(company: str, context_variables: ContextVariables) -> Dict[str, Any]:
-    print("inside extract_info")
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    result = loop.run_until_complete(extract_info_async(company))
-    loop.close()
+async def extract_info(company: str, context_variables: ContextVariables) -> Dict[str, Any]:
+    logger.debug("inside extract_info")
+    result = await extract_info_async(company)
     context_variables.set("social_summary", result['social_summary'])
     context_variables.set("news_summary", result['news_summary'])
     context_variables.set("revenue_summary", result['revenue_summary'])
-    print("completed extract_info")
+    logger.debug("completed extract_info")
     return ReplyResult(message="extracted info", context_variables=context_variables)
 
 
@@ -381,18 +375,27 @@ pattern = AutoPattern(
 # ---------
 # Run example conversation
 # ---------
-messages = [
-    {
-        "role": "user",
-        "content": "Analyze Acme Corporation's latest status for Q3 2025.",
-    }
-]
+async def main():
+    messages = [
+        {
+            "role": "user",
+            "content": "Analyze Acme Corporation's latest status for Q3 2025.",
+        }
+    ]
+
+    result, updated_context, last_agent = await a_initiate_group_chat(
+        pattern=pattern, messages=messages, max_rounds=14
+    )
+
+    # The full ChatResult (transcript + tool-call logs) is debug-only; the
+    # repr is not even built unless debug logging is enabled.
+    logger.debug("chat result: %r", result)
+    del result
+
+    print("=== Full Context ===")
+    print(updated_context.data)
 
-result, updated_context, last_agent = await a_initiate_group_chat(
-    pattern=pattern, messages=messages, max_rounds=20
-)
 
-print("=== Final Result ===")
-print(result)
-print("\n=== Full Context ===")
-print(updated_context.data)
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())